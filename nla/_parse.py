@@ -0,0 +1,167 @@
+"""Hot line-parsing kernel for the log analyzer.
+
+Kept free of closures, module globals (beyond the fallback regex) and untyped
+locals so the whole file compiles unmodified under Cython's pure-Python mode
+(``cythonize -3 -i nla/_parse.py``) when the interpreter-dispatch cost
+matters; no build step is required for normal use.
+"""
+
+import re
+import sys
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict
+
+LOG_LINE_REGEX = re.compile(
+    r'^(?P<ip>\S+)\s+\S+\s+(?:\S+)?\s+\s*(?P<timestamp>.+) "(?P<method>\w+) '
+    r'(?P<url>.+?) HTTP\/.+?"\s+\d+\s+\d+\s+".*"\s+"[^"]+"\s+"[^"]+"\s+"[^"]+'
+    r'"\s+"[^"]+"\s+(?P<request_time>\d+\.\d+)$'
+)
+
+LineValidator = Callable[[bytes], bool]
+LineParser = Callable[[bytes, LineValidator | None], tuple[str, float] | None]
+
+
+def parse_line(line: bytes, validate: LineValidator | None = None) -> tuple[str, float] | None:
+    """Extract (url, request_time) with plain index arithmetic, bypassing the regex engine.
+
+    Operates on raw bytes and decodes only the url slice; falls back to
+    LOG_LINE_REGEX for lines the fast path cannot split. validate, when
+    given, only pre-screens lines headed for that expensive fallback — it
+    never filters the fast path, so the set of accepted lines is the same
+    whether or not a validator (e.g. Hyperscan) is installed.
+    """
+    find = line.find
+    q1: int = find(b'"')
+    q2: int = find(b'"', q1 + 1)
+    if q1 != -1 and q2 != -1:
+        request = line[q1 + 1 : q2]
+        sp1: int = request.find(b" ")
+        sp2: int = request.find(b" ", sp1 + 1)
+        if sp1 != -1 and sp2 != -1:
+            rt = line[line.rfind(b" ") + 1 :]
+            # $request_time is always digits.digits; anything else (e.g. a
+            # truncated line whose last token is the status or byte count)
+            # is structural and must face the strict regex below
+            if rt.count(b".") == 1 and rt.replace(b".", b"", 1).isdigit():
+                return request[sp1 + 1 : sp2].decode("utf-8", "replace"), float(rt)
+
+    if validate is not None and not validate(line):
+        return None
+
+    match = LOG_LINE_REGEX.match(line.decode("utf-8", "replace"))
+    if not match:
+        return None
+    try:
+        return match.group("url"), float(match.group("request_time"))
+    except ValueError:
+        return None
+
+
+def compile_line_parser(log_format: str) -> LineParser | None:
+    """Partially evaluate a known nginx log_format into a specialized parser.
+
+    Tokenizes the format into variable/literal segments and exec-compiles a
+    function that walks a line with inlined literal offsets — no regex and no
+    generic dispatch for the steady-state case. Lines that do not fit the
+    fixed layout are handed to the generic parse_line. Returns None when the
+    format does not contain both $request and $request_time.
+    """
+    parts = re.split(r"\$(\w+)", log_format)
+    lines = ["def _specialized(line, validate=None):", "    i = 0"]
+    emit = lines.append
+    pending: str | None = None
+    captured: set[str] = set()
+
+    def capture(name: str, expr: str) -> None:
+        if name == "request":
+            emit(f"    request = {expr}")
+            captured.add(name)
+        elif name == "request_time":
+            emit(f"    rt = {expr}")
+            captured.add(name)
+
+    for idx, part in enumerate(parts):
+        if idx % 2 == 1:
+            pending = part
+            continue
+        if not part:
+            continue
+        lit = part.encode("utf-8")
+        if pending is None:
+            emit(f"    if not line.startswith({lit!r}, i):")
+            emit("        return parse_line(line, validate)")
+            emit(f"    i += {len(lit)}")
+        else:
+            emit(f"    j = line.find({lit!r}, i)")
+            emit("    if j == -1:")
+            emit("        return parse_line(line, validate)")
+            capture(pending, "line[i:j]")
+            emit(f"    i = j + {len(lit)}")
+            pending = None
+    if pending is not None:
+        capture(pending, "line[i:]")
+    if captured != {"request", "request_time"}:
+        return None
+
+    emit("    sp1 = request.find(b' ')")
+    emit("    sp2 = request.find(b' ', sp1 + 1)")
+    emit("    if sp1 == -1 or sp2 == -1:")
+    emit("        return parse_line(line, validate)")
+    emit("    try:")
+    emit("        return request[sp1 + 1 : sp2].decode('utf-8', 'replace'), float(rt)")
+    emit("    except ValueError:")
+    emit("        return None")
+
+    namespace: Dict[str, object] = {"parse_line": parse_line}
+    exec(compile("\n".join(lines), "<nla._parse generated>", "exec"), namespace)
+    parser: LineParser = namespace["_specialized"]  # type: ignore[assignment]
+    return parser
+
+
+_line_parser: LineParser = parse_line
+
+
+def set_line_parser(parser: LineParser) -> None:
+    """Install the line parser used by parse_chunk.
+
+    Must be called before worker processes fork so they inherit the
+    specialized parser.
+    """
+    global _line_parser
+    _line_parser = parser
+
+
+def parse_chunk(chunk: bytes, validate: LineValidator | None = None) -> tuple[Dict[str, "array[float]"], int, float]:
+    """Parse one chunk of log lines into per-URL request times plus totals.
+
+    validate is handed to the line parser, which consults it only before its
+    regex fallback. Per-URL stats are associative, so chunk results merge
+    trivially in the caller regardless of how chunks were distributed.
+    """
+    url_times: Dict[str, array[float]] = defaultdict(lambda: array("d"))
+    count: int = 0
+    total: float = 0.0
+    # bind everything the loop touches to locals: LOAD_FAST instead of
+    # LOAD_GLOBAL/LOAD_METHOD on every line
+    get_times = url_times.__getitem__
+    intern = sys.intern
+    parse = _line_parser
+    for line in chunk.splitlines():
+        # cheap substring prefilter: skip malformed/non-ui lines
+        # before paying for any field extraction
+        if b" HTTP/" not in line:
+            continue
+
+        parsed = parse(line, validate)
+        if parsed is None:
+            continue
+        url, request_time = parsed
+
+        # intern: one str object per unique URL instead of a fresh allocation
+        # per line, and dict probes short-circuit on pointer equality
+        get_times(intern(url)).append(request_time)
+        count += 1
+        total += request_time
+    # plain dict: a defaultdict with a lambda factory would not pickle
+    return dict(url_times), count, total
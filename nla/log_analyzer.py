@@ -1,34 +1,122 @@
 import argparse
 import gzip
+import heapq
+import io
+import itertools
 import json
+import mmap
+import multiprocessing
 import os
+import pickle
 import re
 import shutil
 import signal
 import sys
 import traceback
+from array import array
 from collections import defaultdict
-from datetime import datetime
 from json import JSONDecodeError
 from pathlib import Path
 from statistics import median
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List
 
 import structlog
 
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import rapidgzip
+except ImportError:  # pragma: no cover - optional dependency
+    rapidgzip = None  # type: ignore[assignment, unused-ignore]
+
+from nla._parse import (  # noqa: F401
+    LOG_LINE_REGEX,
+    compile_line_parser,
+    parse_chunk,
+    set_line_parser,
+)
 from nla.utils.log_config import configure_struct_logger
 
 logger = structlog.get_logger()
 
 LOG_FILE_REGEX = re.compile(r"nginx-access-ui\.log-(\d{8})(\.gz)?$")
 
-LOG_LINE_REGEX = re.compile(
-    r'^(?P<ip>\S+)\s+\S+\s+(?:\S+)?\s+\s*(?P<timestamp>.+) "(?P<method>\w+) '
-    r'(?P<url>.+?) HTTP\/.+?"\s+\d+\s+\d+\s+".*"\s+"[^"]+"\s+"[^"]+"\s+"[^"]+'
-    r'"\s+"[^"]+"\s+(?P<request_time>\d+\.\d+)$'
+# the ui_short format the analyzer is built around; overridable via LOG_FORMAT
+DEFAULT_LOG_FORMAT = (
+    '$remote_addr $remote_user $http_x_real_ip [$time_local] "$request" '
+    '$status $body_bytes_sent "$http_referer" "$http_user_agent" '
+    '"$http_X_FORWARDED_FOR" "$http_X_REQUEST_ID" "$http_X_RB_USER" $request_time'
+)
+
+# capture-free variant of LOG_LINE_REGEX for Hyperscan (no backreferences, no groups)
+HYPERSCAN_LINE_PATTERN = (
+    rb'^[^ ]+ +[^ ]+ +[^ ]* +\[[^\]]*\] "[A-Za-z]+ [^ ]+ HTTP/[^"]*" [0-9]+ [0-9]+ '
+    rb'"[^"]*" "[^"]*" "[^"]*" "[^"]*" "[^"]*" [0-9]+\.[0-9]+$'
 )
 
 
+def _hyperscan_line_validator() -> Callable[[bytes], bool] | None:
+    """Compile a block-mode Hyperscan database as a vectorized line validator.
+
+    Hyperscan's DFA engine scans without backtracking (and auto-dispatches to
+    SSE/AVX), but the stock python-hyperscan build has no capture groups, so
+    the database only pre-screens lines headed for the backtracking regex
+    fallback in parse_line — it never filters the fast path, keeping report
+    contents independent of whether the optional module is installed.
+    Returns None when the dependency is missing or compilation fails.
+    """
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[HYPERSCAN_LINE_PATTERN],
+            ids=[0],
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH],
+        )
+    except Exception as e:
+        logger.warning(f"Hyperscan unavailable, falling back to re: {e}")
+        return None
+
+    hit = [False]
+
+    def on_match(_id: int, _start: int, _end: int, _flags: int, _context: Any) -> None:
+        hit[0] = True
+
+    def validate(line: bytes) -> bool:
+        hit[0] = False
+        db.scan(line, match_event_handler=on_match)
+        return hit[0]
+
+    return validate
+
+
+_line_validator: Callable[[bytes], bool] | None = None
+_line_validator_ready = False
+
+
+def _get_line_validator() -> Callable[[bytes], bool] | None:
+    """Return the per-process Hyperscan validator, compiling it once per worker."""
+    global _line_validator, _line_validator_ready
+    if not _line_validator_ready:
+        _line_validator = _hyperscan_line_validator()
+        _line_validator_ready = True
+    return _line_validator
+
+
 def load_config_file(basic_config: Dict[str, Any], path: str) -> Dict[str, Any]:
     if not os.path.exists(path):
         logger.error(f"Conf file not exist: " f"{path}", exc_info=True, stack_info=True)
@@ -55,17 +143,26 @@ def load_config_file(basic_config: Dict[str, Any], path: str) -> Dict[str, Any]:
         return config
 
 
+LOG_FILE_PREFIX = "nginx-access-ui.log-"
+
+
 def find_latest_log_file(log_dir: Path) -> str | None:
     latest = None
+    prefix_len = len(LOG_FILE_PREFIX)
     try:
-        for entry in os.listdir(log_dir):
-            match = LOG_FILE_REGEX.match(entry)
-            if match:
-                date_str = match.group(1)
-                date = datetime.strptime(date_str, "%Y%m%d")
-                full_path = os.path.join(log_dir, entry)
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                # cheap prefix/suffix checks instead of a regex per entry;
+                # YYYYMMDD compares correctly as a plain integer
+                if not name.startswith(LOG_FILE_PREFIX):
+                    continue
+                date_part = name[prefix_len : prefix_len + 8]
+                if not date_part.isdigit() or name[prefix_len + 8 :] not in ("", ".gz"):
+                    continue
+                date = int(date_part)
                 if not latest or date > latest[0]:
-                    latest = (date, full_path)
+                    latest = (date, entry.path)
     except Exception as e:
         logger.error(
             f"Error while finding log dir {log_dir}: {e}",
@@ -77,50 +174,272 @@ def find_latest_log_file(log_dir: Path) -> str | None:
         return latest[1] if latest else None
 
 
+def _open_gz_log(filepath: str) -> Any:
+    """Open a gzipped log as a binary stream.
+
+    Prefers rapidgzip, which inflates deflate blocks on a worker thread pool
+    instead of pinning one core like stdlib gzip; falls back to gzip.open when
+    the optional module is absent or cannot open the file.
+    """
+    if rapidgzip is not None:
+        try:
+            return rapidgzip.open(filepath, parallelization=os.cpu_count() or 1)
+        except Exception as e:
+            logger.warning(f"rapidgzip failed on {filepath}, falling back to gzip: {e}")
+    # large read-ahead buffer so chunk reads drain memory instead of
+    # dribbling through GzipFile's small internal reads
+    return io.BufferedReader(gzip.open(filepath, "rb"), buffer_size=1 << 20)
+
+
+PARSE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _iter_stream_chunks(f: Any, chunk_size: int = PARSE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield newline-aligned chunks of roughly chunk_size bytes from a binary stream."""
+    tail = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            if tail:
+                yield tail
+            return
+        block = tail + block
+        cut = block.rfind(b"\n")
+        if cut == -1:
+            tail = block
+            continue
+        yield block[: cut + 1]
+        tail = block[cut + 1 :]
+
+
+def _iter_mmap_chunks(mm: mmap.mmap, chunk_size: int = PARSE_CHUNK_SIZE, offset: int = 0) -> Iterator[bytes]:
+    """Yield newline-aligned chunks of a memory-mapped file starting at offset.
+
+    Only newline-terminated data is yielded — an unterminated trailing line
+    (log snapshotted mid-write) is left for the caller, since it must not end
+    up in the persisted parse state. mmap.find dispatches to libc memchr, so
+    the newline scan runs vectorized instead of through the TextIOWrapper
+    line machinery.
+    """
+    pos = offset
+    size = mm.rfind(b"\n") + 1
+    while pos < size:
+        cut = mm.find(b"\n", min(pos + chunk_size, size))
+        if cut == -1:
+            yield mm[pos:size]
+            return
+        yield mm[pos : cut + 1]
+        pos = cut + 1
+
+
+def _iter_log_chunks(filepath: str, offset: int = 0) -> Iterator[bytes]:
+    """Yield newline-aligned byte chunks of a (possibly gzipped) log file.
+
+    offset skips already-parsed bytes of a plain log (see _load_parse_state);
+    gzipped logs are always read from the start.
+    """
+    if filepath.endswith(".gz"):
+        with _open_gz_log(filepath) as f:
+            yield from _iter_stream_chunks(f)
+        return
+    with open(filepath, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            return
+        with mm:
+            yield from _iter_mmap_chunks(mm, offset=offset)
+
+
+class UrlStat:
+    """Streaming per-URL aggregate: running count/sum/max plus a compact
+    array('d') of samples kept only for the median.
+
+    Eight unboxed bytes per request time instead of a list of PyFloat objects
+    (~32B each plus a pointer), and sum/max never re-walk the samples.
+    """
+
+    __slots__ = ("count", "time_sum", "time_max", "times")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.time_sum = 0.0
+        self.time_max = 0.0
+        self.times: array[float] = array("d")
+
+    def extend(self, times: "array[float]") -> None:
+        self.count += len(times)
+        self.time_sum += sum(times)
+        self.time_max = max(self.time_max, max(times))
+        self.times.extend(times)
+
+    def median(self) -> float:
+        if np is not None:
+            # O(n) quickselect in compiled C over the raw buffer instead of
+            # a full Python-level sort
+            arr = np.frombuffer(self.times, dtype=np.float64)
+            mid = len(arr) // 2
+            if len(arr) % 2:
+                return float(np.partition(arr, mid)[mid])
+            part = np.partition(arr, [mid - 1, mid])
+            return float((part[mid - 1] + part[mid]) / 2)
+        return float(median(self.times))
+
+
+def _parse_chunk(chunk: bytes) -> tuple[Dict[str, "array[float]"], int, float]:
+    """Run the nla._parse kernel over one chunk with this process's validator.
+
+    Module-level so multiprocessing workers can pickle it by reference.
+    """
+    return parse_chunk(chunk, _get_line_validator())
+
+
+PARSE_STATE_SUFFIX = ".nla-state"
+PARSE_STATE_VERSION = 2
+PARSE_STATE_HEAD = 256
+
+
+def _load_parse_state(filepath: str) -> tuple[Dict[str, UrlStat], int, float, int, bool] | None:
+    """Load per-URL aggregates persisted by a previous run over the same log.
+
+    Returns (url_stats, total_count, total_time, parsed byte offset, current).
+    current is True when the log is byte-identical (same size and mtime) to
+    what was parsed, so parsing can be skipped outright; otherwise the state
+    covers a prefix of a plain log grown by appended lines and only the tail
+    from offset needs parsing. Returns None for missing, stale or foreign
+    state.
+    """
+    try:
+        with open(filepath + PARSE_STATE_SUFFIX, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != PARSE_STATE_VERSION:
+            return None
+        with open(filepath, "rb") as f:
+            head = f.read(len(state["head"]))
+        if head != state["head"]:
+            return None  # same name, different file
+        st = os.stat(filepath)
+        loaded = (state["url_stats"], state["total_count"], state["total_time"], state["offset"])
+        if st.st_size == state["size"] and st.st_mtime_ns == state["mtime"]:
+            return (*loaded, True)
+        if filepath.endswith(".gz"):
+            return None  # compressed streams cannot resume mid-file
+        if state["offset"] > st.st_size:
+            return None  # log was truncated or rotated in place
+        return (*loaded, False)
+    except (OSError, KeyError, pickle.PickleError, EOFError):
+        return None
+
+
+def _save_parse_state(
+    filepath: str, url_stats: Dict[str, UrlStat], total_count: int, total_time: float, offset: int
+) -> None:
+    try:
+        with open(filepath, "rb") as f:
+            head = f.read(PARSE_STATE_HEAD)
+        st = os.stat(filepath)
+        state = {
+            "version": PARSE_STATE_VERSION,
+            "offset": offset,
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "head": head,
+            "url_stats": url_stats,
+            "total_count": total_count,
+            "total_time": total_time,
+        }
+        with open(filepath + PARSE_STATE_SUFFIX, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except (OSError, pickle.PickleError) as e:
+        logger.warning(f"Could not persist parse state for {filepath}: {e}")
+
+
 def parse_log_file(filepath: str, report_size: int) -> list[dict[str, float | int | str | Any]]:
     total_count = 0
     total_time = 0.0
-    url_stats = defaultdict(list)
-
-    open_func = gzip.open if filepath.endswith(".gz") else open
+    url_stats: Dict[str, UrlStat] = defaultdict(UrlStat)
+
+    offset = 0
+    up_to_date = False
+    resumed = _load_parse_state(filepath)
+    if resumed is not None:
+        url_stats, total_count, total_time, offset, up_to_date = resumed
+        if up_to_date:
+            logger.info(f"Parse state for {filepath} is current, skipping re-parse")
+        else:
+            logger.info(f"Resuming parse of {filepath} from byte {offset}")
 
     try:
-        with open_func(filepath, "rt", encoding="utf-8") as f:
-            for line in f:
-                match = LOG_LINE_REGEX.match(line)
-                if not match:
-                    continue
-
-                url = match.group("url")
-                try:
-                    request_time = float(match.group("request_time"))
-                except ValueError:
-                    continue
-
-                url_stats[url].append(request_time)
-                total_count += 1
-                total_time += request_time
-
+        parsed_bytes = offset
+
+        def _counted(raw_chunks: Iterator[bytes]) -> Iterator[bytes]:
+            nonlocal parsed_bytes
+            for chunk in raw_chunks:
+                parsed_bytes += len(chunk)
+                yield chunk
+
+        chunks = _counted(_iter_log_chunks(filepath, offset)) if not up_to_date else iter(())
+        first = next(chunks, None)
+        second = next(chunks, None) if first is not None else None
+
+        def _merge(result: tuple[Dict[str, "array[float]"], int, float]) -> None:
+            nonlocal total_count, total_time
+            chunk_times, chunk_count, chunk_time = result
+            for url, times in chunk_times.items():
+                # keys arrive as fresh strings from each worker's pickle;
+                # intern so long-lived url_stats holds one object per URL
+                url_stats[sys.intern(url)].extend(times)
+            total_count += chunk_count
+            total_time += chunk_time
+
+        if first is not None and second is None:
+            # single-chunk file: pool startup would cost more than it saves
+            _merge(_parse_chunk(first))
+        elif first is not None and second is not None:
+            workers = os.cpu_count() or 1
+            with multiprocessing.Pool(workers) as pool:
+                pending = itertools.chain([first, second], chunks)
+                for result in pool.imap_unordered(_parse_chunk, pending):
+                    _merge(result)
+
+        if first is not None:
+            _save_parse_state(filepath, url_stats, total_count, total_time, parsed_bytes)
+
+        if not filepath.endswith(".gz"):
+            # parse the unterminated tail only after persisting state: it
+            # counts toward this report but is re-parsed on the next run,
+            # once the line has (presumably) been completed
+            with open(filepath, "rb") as f:
+                f.seek(parsed_bytes)
+                tail = f.read()
+            if tail:
+                _merge(_parse_chunk(tail))
+
+        # pick the top report_size URLs by time_sum first — O(N log k) heap
+        # pass instead of a full sort, and only the winners pay for the
+        # median and dict construction
+        top = heapq.nlargest(report_size, url_stats.items(), key=lambda kv: kv[1].time_sum)
+
+        # rows are built with builtin round() regardless of numpy: np.round
+        # rounds boundary values differently, and report contents must not
+        # depend on which optional modules are installed (the vectorization
+        # win over k <= report_size rows is negligible anyway)
         stats = []
-        for url, times in url_stats.items():
-            count = len(times)
-            time_sum = sum(times)
+        for url, stat in top:
             stats.append(
                 {
                     "url": url,
-                    "count": count,
-                    "count_perc": round(count / total_count * 100, 3),
-                    "time_sum": round(time_sum, 3),
-                    "time_perc": round(time_sum / total_time * 100, 3),
-                    "time_avg": round(time_sum / count, 3),
-                    "time_max": round(max(times), 3),
-                    "time_med": round(median(times), 3),
+                    "count": stat.count,
+                    "count_perc": round(stat.count / total_count * 100, 3),
+                    "time_sum": round(stat.time_sum, 3),
+                    "time_perc": round(stat.time_sum / total_time * 100, 3),
+                    "time_avg": round(stat.time_sum / stat.count, 3),
+                    "time_max": round(stat.time_max, 3),
+                    "time_med": round(stat.median(), 3),
                 }
             )
 
-        stats.sort(key=lambda x: x["time_sum"], reverse=True)
-
-        return stats[:report_size]
+        return stats
     except Exception as e:
         logger.error(
             f"Error while parsing log file {filepath}: {e}",
@@ -139,11 +458,17 @@ def render_report(report_data: List[Any], report_dir: Path, report_date: str, re
         with open(f"{resources_dir}/report.html", "r", encoding="utf-8") as template_file:
             template = template_file.read()
 
-        json_data = json.dumps(report_data, ensure_ascii=False)
-        report_content = template.replace("$table_json", json_data)
-
-        with open(report_path, "w", encoding="utf-8") as output_file:
-            output_file.write(report_content)
+        # write prefix / json / suffix as three buffered binary writes instead
+        # of materializing the whole rendered page via str.replace
+        prefix, placeholder, suffix = template.partition("$table_json")
+        with open(report_path, "wb") as output_file:
+            output_file.write(prefix.encode("utf-8"))
+            if placeholder:
+                if orjson is not None:
+                    output_file.write(orjson.dumps(report_data))
+                else:
+                    output_file.write(json.dumps(report_data, ensure_ascii=False).encode("utf-8"))
+                output_file.write(suffix.encode("utf-8"))
 
         logger.info(f"Report created: {report_path}")
         return
@@ -156,7 +481,16 @@ def copy_jc_function(resources_dir: Path, report_dir: Path) -> None:
     try:
         src = f"{resources_dir}/jquery.tablesorter.min.js"
         dst = f"{report_dir}/jquery.tablesorter.min.js"
-        shutil.copyfile(src, dst)
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return  # already linked by a previous run
+        try:
+            # O(1) metadata operation instead of re-copying the asset each run
+            os.link(src, dst)
+        except FileExistsError:
+            pass
+        except OSError:
+            # cross-device or unsupported filesystem: fall back to a byte copy
+            shutil.copyfile(src, dst)
     except Exception as e:
         logger.error(f"Error while copying js file: {e}", exc_info=True, stack_info=True)
 
@@ -186,6 +520,7 @@ def main() -> None:
         "LOG_DIR": "../log",
         "DATA_DIR": "../data",
         "STRUCT_LOG_FILE": "../app.log",
+        "LOG_FORMAT": DEFAULT_LOG_FORMAT,
     }
 
     parent_path = Path(__file__).parent
@@ -205,6 +540,16 @@ def main() -> None:
     global logger
     logger = configure_struct_logger(log_file)
 
+    # specialize the line parser for the configured log_format; must happen
+    # before parse_log_file forks its worker pool
+    log_format = config.get("LOG_FORMAT")
+    if isinstance(log_format, str) and log_format:
+        specialized = compile_line_parser(log_format)
+        if specialized is not None:
+            set_line_parser(specialized)
+        else:
+            logger.warning("LOG_FORMAT lacks $request/$request_time, keeping the generic parser")
+
     # define latest log file
     latest_log_file = find_latest_log_file(log_dir)
     if not latest_log_file:
@@ -212,13 +557,14 @@ def main() -> None:
         return
     logger.info(f"Log file loaded successfully: {latest_log_file}")
 
-    # extracting log date
-    log_file_date_match = re.search(r"(\d{8})", latest_log_file)
+    # extracting log date (reuse the anchored file-name pattern instead of re-scanning the whole path)
+    log_file_date_match = LOG_FILE_REGEX.search(os.path.basename(latest_log_file))
     log_file_date = log_file_date_match.group(1) if log_file_date_match else None
     if log_file_date is None:
         logger.error("Could not extract date from log file name.")
         return
-    log_file_date_converted = datetime.strptime(log_file_date, "%Y%m%d").strftime("%Y.%m.%d")
+    # fixed YYYYMMDD layout: plain slicing instead of a strptime/strftime round-trip
+    log_file_date_converted = f"{log_file_date[:4]}.{log_file_date[4:6]}.{log_file_date[6:8]}"
 
     # check whether repost exists
     report_path = Path(report_dir) / f"report-{log_file_date_converted}.html"
@@ -1,6 +1,7 @@
 import gzip
 import json
 import os
+import pickle
 import tempfile
 from pathlib import Path
 from typing import Any, Generator
@@ -10,6 +11,7 @@ import pytest
 from pytest import MonkeyPatch
 
 import nla.log_analyzer as analyzer
+from nla._parse import compile_line_parser, parse_chunk, parse_line
 from nla.log_analyzer import (
     find_latest_log_file,
     load_config_file,
@@ -110,6 +112,153 @@ def test_parse_log_file_gz() -> None:
     os.unlink(gz_path)
 
 
+def test_parse_log_file_rejects_truncated_line() -> None:
+    good_line = (
+        r"1.196.116.32 -  - [29/Jun/2017:03:50:22 +0300] "
+        r'"GET /api/v2/banner/25019354 HTTP/1.1" 200 927 "-" '
+        r'"Lynx/2.8.8dev.9" "-" "1498697422-2190034393-4708-9752759"'
+        r' "dc7161be3" 0.390'
+    )
+    # snapshotted mid-write: last token is the byte count, not $request_time
+    truncated_line = r'1.196.116.32 -  - [29/Jun/2017:03:50:22 +0300] "GET /trunc HTTP/1.1" 200 927'
+    with tempfile.NamedTemporaryFile(mode="wt", delete=False) as f:
+        f.write(good_line + "\n" + truncated_line + "\n")
+        name = f.name
+
+    result = parse_log_file(name, report_size=10)
+    assert len(result) == 1
+    assert result[0]["url"] == "/api/v2/banner/25019354"
+    assert result[0]["count"] == 1
+    os.unlink(name)
+
+
+def _log_line(url: str, request_time: str) -> str:
+    return (
+        r"1.196.116.32 -  - [29/Jun/2017:03:50:22 +0300] "
+        rf'"GET {url} HTTP/1.1" 200 927 "-" '
+        r'"Lynx/2.8.8dev.9" "-" "1498697422-2190034393-4708-9752759"'
+        rf' "dc7161be3" {request_time}'
+    )
+
+
+def test_parse_log_file_resume_completes_partial_line(tmp_path: Path) -> None:
+    log_path = tmp_path / "access.log"
+    full_line = _log_line("/partial", "0.700")
+    # snapshotted mid-write: the last line is cut off without a newline
+    log_path.write_text(_log_line("/a", "0.100") + "\n" + full_line[:40], encoding="utf-8")
+    parse_log_file(str(log_path), report_size=10)
+
+    # the write completes and one more line lands
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(full_line[40:] + "\n" + _log_line("/b", "0.200") + "\n")
+    resumed = parse_log_file(str(log_path), report_size=10)
+
+    (log_path.parent / (log_path.name + ".nla-state")).unlink()
+    fresh = parse_log_file(str(log_path), report_size=10)
+    assert resumed == fresh
+    assert {row["url"] for row in resumed} == {"/a", "/b", "/partial"}
+
+
+def test_parse_state_skips_unchanged_log(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    log_path = tmp_path / "access.log"
+    log_path.write_text(_log_line("/a", "0.100") + "\n" + _log_line("/b", "0.200") + "\n", encoding="utf-8")
+    first = parse_log_file(str(log_path), report_size=10)
+    assert (tmp_path / ("access.log" + analyzer.PARSE_STATE_SUFFIX)).exists()
+
+    def boom(chunk: bytes) -> Any:
+        raise AssertionError("unchanged log must not be re-parsed")
+
+    monkeypatch.setattr(analyzer, "_parse_chunk", boom)
+    second = parse_log_file(str(log_path), report_size=10)
+    assert first == second
+
+
+def test_parse_state_resume_after_append(tmp_path: Path) -> None:
+    log_path = tmp_path / "access.log"
+    log_path.write_text(_log_line("/a", "0.100") + "\n", encoding="utf-8")
+    parse_log_file(str(log_path), report_size=10)
+
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(_log_line("/b", "0.200") + "\n")
+    resumed = parse_log_file(str(log_path), report_size=10)
+
+    (tmp_path / ("access.log" + analyzer.PARSE_STATE_SUFFIX)).unlink()
+    fresh = parse_log_file(str(log_path), report_size=10)
+    assert resumed == fresh
+    assert {row["url"] for row in resumed} == {"/a", "/b"}
+
+
+def test_parse_state_rejected_on_rotation(tmp_path: Path) -> None:
+    log_path = tmp_path / "access.log"
+    log_path.write_text(_log_line("/old", "0.100") + "\n", encoding="utf-8")
+    parse_log_file(str(log_path), report_size=10)
+
+    # rotated in place: same name, different content from the first byte on
+    log_path.write_text(_log_line("/new", "0.200") + "\n", encoding="utf-8")
+    result = parse_log_file(str(log_path), report_size=10)
+    assert [row["url"] for row in result] == ["/new"]
+
+
+def test_parse_state_rejected_on_truncation(tmp_path: Path) -> None:
+    log_path = tmp_path / "access.log"
+    lines = [_log_line(f"/u/{i}", "0.100") for i in range(5)]
+    log_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    parse_log_file(str(log_path), report_size=10)
+
+    # truncated: the head bytes still match, but the log shrank below the offset
+    log_path.write_text("\n".join(lines[:2]) + "\n", encoding="utf-8")
+    result = parse_log_file(str(log_path), report_size=10)
+    assert sum(row["count"] for row in result) == 2
+
+
+def test_parse_state_stale_version_rebuilt(tmp_path: Path) -> None:
+    log_path = tmp_path / "access.log"
+    log_path.write_text(_log_line("/a", "0.100") + "\n", encoding="utf-8")
+    fresh = parse_log_file(str(log_path), report_size=10)
+
+    state_path = tmp_path / ("access.log" + analyzer.PARSE_STATE_SUFFIX)
+    with open(state_path, "rb") as f:
+        state = pickle.load(f)
+    state["version"] = analyzer.PARSE_STATE_VERSION - 1
+    with open(state_path, "wb") as f:
+        pickle.dump(state, f)
+
+    result = parse_log_file(str(log_path), report_size=10)
+    assert result == fresh
+    with open(state_path, "rb") as f:
+        assert pickle.load(f)["version"] == analyzer.PARSE_STATE_VERSION
+
+
+def test_compile_line_parser_default_format() -> None:
+    parser = compile_line_parser(analyzer.DEFAULT_LOG_FORMAT)
+    assert parser is not None
+    line = _log_line("/api/v2/banner/25019354", "0.390").encode("utf-8")
+    assert parser(line) == parse_line(line) == ("/api/v2/banner/25019354", 0.39)
+
+
+def test_compile_line_parser_requires_both_fields() -> None:
+    assert compile_line_parser('$remote_addr "$request"') is None
+    assert compile_line_parser("$remote_addr $request_time") is None
+    assert compile_line_parser("$remote_addr [$time_local]") is None
+
+
+def test_parse_chunk_validator_only_gates_regex_fallback() -> None:
+    # a validator must never change which fast-path-parseable lines count,
+    # so results cannot depend on whether hyperscan is installed
+    chunk = (_log_line("/a", "0.100") + "\n" + _log_line("/b", "0.200") + "\n").encode("utf-8")
+    assert parse_chunk(chunk, lambda line: False) == parse_chunk(chunk)
+
+
+def test_compile_line_parser_falls_back_on_layout_mismatch() -> None:
+    parser = compile_line_parser(analyzer.DEFAULT_LOG_FORMAT)
+    assert parser is not None
+    assert parser(b"totally not a log line") is None
+    # missing the quoted trailing fields: the specialized walk fails and the
+    # generic parser takes over
+    short_line = b'1.1.1.1 -  - [29/Jun/2017:03:50:22 +0300] "GET /a HTTP/1.1" 200 927 0.390'
+    assert parser(short_line) == parse_line(short_line) == ("/a", 0.39)
+
+
 def test_render_report(tmp_path: Path) -> Any:
     report_data = [
         {